@@ -11,6 +11,7 @@ import json
 import requests
 import logging
 import sys
+import time
 
 # configure logging early so import errors are visible
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
@@ -51,6 +52,24 @@ def _handle_uncaught(exc_type, exc_value, exc_tb):
 
 sys.excepthook = _handle_uncaught
 
+# marketplaces: scanner.py is the single source (MARKETPLACES / get_marketplace)
+def _marketplace_choices():
+    """Template args for the marketplace selects; empty if the scanner import failed."""
+    if scanner is None:
+        return {"marketplaces": {}, "default_marketplace": None}
+    return {"marketplaces": scanner.MARKETPLACES, "default_marketplace": scanner.DEFAULT_MARKETPLACE}
+
+def _resolve_marketplace(code):
+    """Validate a marketplace code from a form. Flashes a message and returns None if unusable."""
+    if scanner is None:
+        flash("Scanner-Modul nicht verfügbar.", "danger")
+        return None
+    try:
+        return scanner.get_marketplace(code)[0]
+    except ValueError as e:
+        flash(str(e), "warning")
+        return None
+
 def get_db():
     return mysql.connector.connect(
         host=config.DB_HOST,
@@ -62,10 +81,70 @@ def get_db():
         charset='utf8mb4'
     )
 
+# Dashboard summary: read from asin_summary/pattern_summary (maintained by the scanner),
+# cached in-process. In-process scans invalidate the cache via scanner.SCAN_COMPLETE_HOOKS;
+# the TTL covers scans run by cron in a separate process.
+SUMMARY_CACHE_TTL = getattr(config, "SUMMARY_CACHE_TTL", 60)
+# "generation" is bumped on every invalidation, so a read that overlapped a scan never gets cached
+_summary_cache = {"data": None, "loaded_at": 0.0, "generation": 0}
+_summary_lock = threading.Lock()
+
+def invalidate_summary_cache(*_args):
+    with _summary_lock:
+        _summary_cache["data"] = None
+        _summary_cache["generation"] += 1
+
+if scanner is not None and hasattr(scanner, "SCAN_COMPLETE_HOOKS"):
+    scanner.SCAN_COMPLETE_HOOKS.append(invalidate_summary_cache)
+
+def get_dashboard_summary():
+    """Return {'marketplaces': [...], 'totals': {...}, 'top_patterns': [...]} from the summary tables."""
+    with _summary_lock:
+        data = _summary_cache["data"]
+        if data is not None and time.monotonic() - _summary_cache["loaded_at"] < SUMMARY_CACHE_TTL:
+            return data
+        generation = _summary_cache["generation"]
+
+    db = get_db()
+    cur = db.cursor(dictionary=True)
+    cur.execute("""SELECT a.marketplace,
+                          COUNT(*) AS asins,
+                          CAST(COALESCE(SUM(s.open_findings), 0) AS SIGNED) AS open_findings,
+                          CAST(COALESCE(SUM(s.open_findings > 0), 0) AS SIGNED) AS asins_with_findings,
+                          CAST(COALESCE(SUM(s.last_status = 'error'), 0) AS SIGNED) AS errors,
+                          MAX(s.last_scanned_at) AS last_scanned_at
+                   FROM asins a
+                   LEFT JOIN asin_summary s ON s.asin_id = a.id
+                   WHERE a.active = 1
+                   GROUP BY a.marketplace
+                   ORDER BY a.marketplace""")
+    marketplaces = cur.fetchall()
+    cur.execute("""SELECT p.name, ps.hits
+                   FROM pattern_summary ps
+                   JOIN patterns p ON ps.pattern_id = p.id
+                   ORDER BY ps.hits DESC LIMIT 10""")
+    top_patterns = cur.fetchall()
+    cur.close()
+    db.close()
+
+    totals = {key: sum(m[key] for m in marketplaces) for key in ("asins", "open_findings", "asins_with_findings", "errors")}
+    data = {"marketplaces": marketplaces, "totals": totals, "top_patterns": top_patterns}
+    with _summary_lock:
+        # a scan finished (or ASINs/patterns changed) while we were reading: don't cache the stale snapshot
+        if _summary_cache["generation"] == generation:
+            _summary_cache["data"] = data
+            _summary_cache["loaded_at"] = time.monotonic()
+    return data
+
 # --- Routes ---
 @app.route('/')
 def index():
-    return render_template('index.html')
+    try:
+        summary = get_dashboard_summary()
+    except Exception as e:
+        app.logger.exception("Fehler beim Laden der Summary: %s", e)
+        summary = None
+    return render_template('index.html', summary=summary, **_marketplace_choices())
 
 # ASIN list view / add / remove
 @app.route('/asins', methods=['GET', 'POST'])
@@ -75,19 +154,24 @@ def asins():
     if request.method == 'POST':
         asin = request.form.get('asin', '').strip()
         note = request.form.get('note', '').strip()
-        if asin:
+        marketplace = _resolve_marketplace(request.form.get('marketplace'))
+        if marketplace and asin:
             try:
-                cur.execute("INSERT INTO asins (asin, note) VALUES (%s, %s)", (asin, note))
-                flash(f"ASIN {asin} hinzugefügt.", "success")
+                cur.execute("INSERT INTO asins (asin, marketplace, note) VALUES (%s, %s, %s)", (asin, marketplace, note))
+                flash(f"ASIN {asin} ({marketplace}) hinzugefügt.", "success")
+                invalidate_summary_cache()
             except mysql.connector.IntegrityError:
-                flash(f"ASIN {asin} existiert bereits.", "warning")
+                flash(f"ASIN {asin} ({marketplace}) existiert bereits.", "warning")
         return redirect(url_for('asins'))
 
-    cur.execute("SELECT * FROM asins ORDER BY created_at DESC")
+    cur.execute("""SELECT a.*, s.open_findings, s.last_status
+                   FROM asins a
+                   LEFT JOIN asin_summary s ON s.asin_id = a.id
+                   ORDER BY a.created_at DESC""")
     rows = cur.fetchall()
     cur.close()
     db.close()
-    return render_template('asin_list.html', asins=rows)
+    return render_template('asin_list.html', asins=rows, **_marketplace_choices())
 
 @app.route('/asins/toggle/<int:asin_id>')
 def asin_toggle(asin_id):
@@ -96,6 +180,7 @@ def asin_toggle(asin_id):
     cur.execute("UPDATE asins SET active = 1 - active WHERE id = %s", (asin_id,))
     cur.close()
     db.close()
+    invalidate_summary_cache()
     return redirect(url_for('asins'))
 
 @app.route('/asins/delete/<int:asin_id>')
@@ -105,6 +190,7 @@ def asin_delete(asin_id):
     cur.execute("DELETE FROM asins WHERE id = %s", (asin_id,))
     cur.close()
     db.close()
+    invalidate_summary_cache()
     flash("ASIN gelöscht.", "info")
     return redirect(url_for('asins'))
 
@@ -124,7 +210,10 @@ def patterns():
             flash("Pattern hinzugefügt.", "success")
         return redirect(url_for('patterns'))
 
-    cur.execute("SELECT * FROM patterns ORDER BY created_at DESC")
+    cur.execute("""SELECT p.*, COALESCE(ps.hits, 0) AS hits
+                   FROM patterns p
+                   LEFT JOIN pattern_summary ps ON ps.pattern_id = p.id
+                   ORDER BY p.created_at DESC""")
     rows = cur.fetchall()
     cur.close()
     db.close()
@@ -146,6 +235,7 @@ def pattern_delete(pid):
     cur.execute("DELETE FROM patterns WHERE id = %s", (pid,))
     cur.close()
     db.close()
+    invalidate_summary_cache()
     flash("Pattern gelöscht.", "info")
     return redirect(url_for('patterns'))
 
@@ -154,7 +244,7 @@ def pattern_delete(pid):
 def results():
     db = get_db()
     cur = db.cursor(dictionary=True)
-    cur.execute("""SELECT r.*, a.asin AS asin, p.name AS pattern_name
+    cur.execute("""SELECT r.*, a.asin AS asin, a.marketplace AS marketplace, p.name AS pattern_name
                    FROM results r
                    JOIN asins a ON r.asin_id = a.id
                    JOIN patterns p ON r.pattern_id = p.id
@@ -172,10 +262,13 @@ def run_one():
     if not asin:
         flash("Keine ASIN angegeben.", "warning")
         return redirect(url_for('index'))
+    marketplace = _resolve_marketplace(request.form.get('marketplace'))
+    if not marketplace:
+        return redirect(url_for('index'))
     # Simple: call scanner logic in-process for this single ASIN
     from scanner import run_scan_for_asin
     try:
-        count = run_scan_for_asin(asin)
+        count = run_scan_for_asin(asin, marketplace)
         flash(f"Scan abgeschlossen: {count} Treffer.", "success")
     except Exception as e:
         flash(f"Fehler beim Scan: {e}", "danger")
@@ -203,14 +296,14 @@ def run_scanner():
 
 @app.route("/scan_logs")
 def scan_logs():
-    """Zeige zuletzt gespeicherte Scan-Logs (scanned_at, asin, matches_count, note)."""
+    """Zeige zuletzt gespeicherte Scan-Logs (scanned_at, asin, matches_count, note, marketplace)."""
     try:
         # nutze die vorhandene DB-Helferfunktion aus scanner.py
         from scanner import get_db
         db = get_db()
         cur = db.cursor()
         cur.execute("""
-            SELECT sl.id, a.asin, sl.scanned_at, sl.matches_count, sl.note
+            SELECT sl.id, a.asin, sl.scanned_at, sl.matches_count, sl.note, sl.marketplace
             FROM scan_logs sl
             LEFT JOIN asins a ON sl.asin_id = a.id
             ORDER BY sl.scanned_at DESC
@@ -12,9 +12,24 @@ DB_NAME = "asinscanner"
 HTTP_TIMEOUT = 20
 USER_AGENT = "ASINScanner/1.0 (+https://yourdomain.example)"
 REQUESTS_SLEEP = 2  # Sekunden Pause zwischen Requests (verringert Load)
+MAX_PAGE_BYTES = 4 * 1024 * 1024  # größere Produktseiten werden beim Download abgeschnitten
+
+# Marktplätze: jede Domain bekommt eine eigene Scan-Lane mit eigener Parallelität
+# (concurrency) und eigenem Rate-Budget (sleep = Sekunden zwischen Requests,
+# backoff = Pause nach 429/503, retries = erneute Versuche einer gedrosselten ASIN).
+# Ein gedrosselter Marktplatz bremst so die anderen nicht aus.
+DEFAULT_MARKETPLACE = "de"
+MARKETPLACES = {
+    "de": {"domain": "www.amazon.de", "accept_language": "en-US,en;q=0.9,de;q=0.8", "concurrency": 2, "sleep": REQUESTS_SLEEP, "backoff": 60, "retries": 2},
+    "fr": {"domain": "www.amazon.fr", "accept_language": "fr-FR,fr;q=0.9,en;q=0.8", "concurrency": 2, "sleep": REQUESTS_SLEEP, "backoff": 60, "retries": 2},
+    "it": {"domain": "www.amazon.it", "accept_language": "it-IT,it;q=0.9,en;q=0.8", "concurrency": 2, "sleep": REQUESTS_SLEEP, "backoff": 60, "retries": 2},
+    "es": {"domain": "www.amazon.es", "accept_language": "es-ES,es;q=0.9,en;q=0.8", "concurrency": 2, "sleep": REQUESTS_SLEEP, "backoff": 60, "retries": 2},
+    "uk": {"domain": "www.amazon.co.uk", "accept_language": "en-GB,en;q=0.9", "concurrency": 2, "sleep": REQUESTS_SLEEP, "backoff": 60, "retries": 2},
+}
 
 # Website config
 SECRET_KEY = "change_this_to_something_secret_and_random"
+SUMMARY_CACHE_TTL = 60  # Sekunden; Übersicht auf der Startseite (Scans per cron laufen in eigenem Prozess)
 
 # Optional: Cron-run path (nur für Hinweise)
 PYTHON_BIN = "/usr/bin/python3"
@@ -1,6 +1,8 @@
 # scanner.py
 import time
 import re
+import io
+import codecs
 import requests
 from bs4 import BeautifulSoup
 import mysql.connector
@@ -9,6 +11,13 @@ from datetime import datetime
 import config
 import logging
 import sys
+import threading
+import tracemalloc
+try:
+    import resource  # Unix only, used for max-RSS figures in --bench
+except ImportError:
+    resource = None
+from concurrent.futures import ThreadPoolExecutor
 
 # configure logger and debug mode driven by config.DEBUG (set DEBUG = 1 in config.py to enable)
 DEBUG_MODE = bool(getattr(config, "DEBUG", 0) == 1 or getattr(config, "DEBUG", False))
@@ -24,6 +33,34 @@ logger.setLevel(logging.DEBUG if DEBUG_MODE else logging.INFO)
 # convenience for backward-compatible calls in the file
 # replace existing root-logging calls with logger.*
 
+# marketplaces (fallback for older config.py without MARKETPLACES)
+DEFAULT_MARKETPLACE = getattr(config, "DEFAULT_MARKETPLACE", "de")
+MARKETPLACES = getattr(config, "MARKETPLACES", None) or {
+    "de": {"domain": "www.amazon.de", "accept_language": "en-US,en;q=0.9,de;q=0.8",
+           "concurrency": 1, "sleep": config.REQUESTS_SLEEP, "backoff": 60},
+}
+
+# upper bound for a downloaded product page; larger pages are truncated
+MAX_PAGE_BYTES = int(getattr(config, "MAX_PAGE_BYTES", 4 * 1024 * 1024))
+
+# HTTP status codes Amazon answers with when a marketplace throttles us
+THROTTLE_STATUS = (429, 503)
+
+def throttle_status(exc):
+    """Return the HTTP status if exc is a throttling response (429/503), else None."""
+    response = getattr(exc, "response", None)
+    if isinstance(exc, requests.HTTPError) and response is not None and response.status_code in THROTTLE_STATUS:
+        return response.status_code
+    return None
+
+def get_marketplace(marketplace=None):
+    """Normalize a marketplace code and return (code, settings). Raises ValueError if unknown."""
+    code = (marketplace or DEFAULT_MARKETPLACE).strip().lower()
+    settings = MARKETPLACES.get(code)
+    if settings is None:
+        raise ValueError(f"Unbekannter Marktplatz: {marketplace}")
+    return code, settings
+
 def get_db():
     if DEBUG_MODE:
         logger.debug("Connecting to DB host=%s port=%s db=%s user=%s", config.DB_HOST, config.DB_PORT, config.DB_NAME, config.DB_USER)
@@ -37,25 +74,64 @@ def get_db():
         charset='utf8mb4'
     )
 
-def fetch_product_html(asin):
-    # Amazon product URL (regional could vary — adapt if needed)
-    url = f"https://www.amazon.de/dp/{asin}"
+def fetch_product_html(asin, marketplace=None):
+    """Download the product page in chunks, capped at MAX_PAGE_BYTES.
+
+    Returns (url, raw bytes, encoding); encoding is the charset requests derives
+    from the Content-Type header (what resp.text used), None if there is none.
+    """
+    # Amazon product URL on the marketplace's own domain
+    code, mp = get_marketplace(marketplace)
+    url = f"https://{mp['domain']}/dp/{asin}"
     headers = {
         "User-Agent": config.USER_AGENT,
-        "Accept-Language": "en-US,en;q=0.9,de;q=0.8"
+        "Accept-Language": mp.get("accept_language", "en-US,en;q=0.9")
     }
     if DEBUG_MODE:
         logger.debug("Fetching URL %s with headers %s", url, {k: headers[k] for k in ("User-Agent",)})
     start = time.time()
-    resp = requests.get(url, headers=headers, timeout=config.HTTP_TIMEOUT)
-    elapsed = time.time() - start
-    if DEBUG_MODE:
-        logger.debug("Fetched %s status=%s elapsed=%.2fs content-length=%s", url, resp.status_code, elapsed, resp.headers.get("Content-Length"))
-    resp.raise_for_status()
-    return url, resp.text
-
-def extract_text_and_hrefs(html):
-    soup = BeautifulSoup(html, "lxml")
+    with requests.get(url, headers=headers, timeout=config.HTTP_TIMEOUT, stream=True) as resp:
+        resp.raise_for_status()
+        # BytesIO.getvalue() hands out its buffer without copying (bytes(bytearray) would double the peak)
+        body = io.BytesIO()
+        encoding = resp.encoding
+        for chunk in resp.iter_content(chunk_size=64 * 1024):
+            remaining = MAX_PAGE_BYTES - body.tell()
+            if len(chunk) > remaining:
+                logger.warning("Seite %s größer als %d Bytes, wird abgeschnitten.", url, MAX_PAGE_BYTES)
+                tail = chunk[:remaining]
+                if encoding is None or codecs.lookup(encoding).name == "utf-8":
+                    tail = _trim_partial_utf8(tail)
+                body.write(tail)
+                break
+            body.write(chunk)
+        elapsed = time.time() - start
+        if DEBUG_MODE:
+            logger.debug("Fetched %s status=%s elapsed=%.2fs bytes=%d", url, resp.status_code, elapsed, body.tell())
+    # raw bytes + HTTP charset: BeautifulSoup decodes once, no extra decoded str copy
+    return url, body.getvalue(), encoding
+
+def _trim_partial_utf8(data):
+    """Drop a UTF-8 multibyte character cut in half at the end of data (so the page still decodes strictly)."""
+    for back in range(1, min(4, len(data)) + 1):
+        byte = data[-back]
+        if byte & 0xC0 == 0x80:  # continuation byte, keep looking for the lead byte
+            continue
+        if byte >= 0xC0:
+            needed = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            if needed > back:
+                return data[:-back]
+        return data
+    return data
+
+def extract_text_and_hrefs(html, encoding=None):
+    """Extract the searchable regions and release the parse tree right away.
+
+    Returns (sections, hrefs, title, full_text): sections are the individual
+    region texts (title, meta-description, description, bullets, details),
+    full_text is the whole page text. encoding is the HTTP charset, if known.
+    """
+    soup = BeautifulSoup(html, "lxml", from_encoding=encoding)
     # Try to get the product description sections — fallbacks present
     texts = []
     hrefs = []
@@ -106,15 +182,57 @@ def extract_text_and_hrefs(html):
         for a in detail.find_all("a", href=True):
             hrefs.append(a['href'])
 
-    # full page text fallback
+    # full page text fallback (searched on its own, not appended to the sections again)
     full_text = soup.get_text(" ", strip=True)
-    texts.append(full_text)
     if DEBUG_MODE:
         logger.debug("Full page text length=%d, hrefs_count=%d", len(full_text), len(hrefs))
 
-    joined_text = "\n".join(texts)
-    # return joined_text (for text searches), hrefs, raw title and raw html for optional html-searches
-    return joined_text, hrefs, title_tag, full_text
+    # regions are extracted: free the parse tree now instead of at function exit
+    soup.decompose()
+    del soup, desc, bullets, detail, meta
+
+    return texts, hrefs, title_tag, full_text
+
+def page_sources(html, encoding=None):
+    """Extract a page into its searchable sources ({source: [strings]}).
+
+    Same sources as before: title, the joined region texts, the full page text
+    and the region hrefs. Only the copy of full_text that used to be appended to
+    the joined text is gone, so full-text hits are found (and stored) once.
+    """
+    sections, hrefs, title_tag, full_text = extract_text_and_hrefs(html, encoding)
+    return {
+        "title": [title_tag] if title_tag else [],
+        "text": ["\n".join(sections)] if sections else [],
+        "html": [full_text],
+        "href": hrefs,
+    }
+
+class Match:
+    """Compact match record: offsets into a source string instead of copied substrings."""
+
+    __slots__ = ("source", "index", "start", "end", "group_start", "group_end")
+
+    def __init__(self, source, index, m):
+        self.source = source  # "title", "text", "html" or "href"
+        self.index = index  # position in the source list (e.g. href number)
+        self.start, self.end = m.span()
+        self.group_start, self.group_end = m.span(1) if m.re.groups else (-1, -1)
+
+    def text(self, sources):
+        return sources[self.source][self.index][self.start:self.end]
+
+    def group(self, sources):
+        if self.group_start < 0:
+            return None
+        return sources[self.source][self.index][self.group_start:self.group_end]
+
+def find_matches(cre, sources):
+    """Yield a Match for every hit of cre in the page sources (dict of source -> list of strings)."""
+    for source, items in sources.items():
+        for index, item in enumerate(items):
+            for m in cre.finditer(item):
+                yield Match(source, index, m)
 
 def load_active_patterns(cursor):
     cursor.execute("SELECT id, name, pattern, flags FROM patterns WHERE active=1")
@@ -158,166 +276,225 @@ def load_active_patterns(cursor):
         logger.debug("Total compiled patterns: %d", len(compiled))
     return compiled
 
-def run_scan_for_asin(asin):
-    """Scan a single ASIN once. Returns number of matches inserted."""
-    logger.info("Start scan for ASIN %s", asin) if not DEBUG_MODE else logger.debug("Start scan for ASIN %s", asin)
-    db = get_db()
-    cur = db.cursor()
-    try:
-        url, html = fetch_product_html(asin)
-    except Exception as e:
-        logger.exception("Fehler beim Abruf für %s: %s", asin, e)
+def _get_asin_id(cur, asin, marketplace, create=False):
+    cur.execute("SELECT id FROM asins WHERE asin=%s AND marketplace=%s", (asin, marketplace))
+    row = cur.fetchone()
+    if row:
+        return row[0]
+    if not create:
+        return None
+    cur.execute("INSERT INTO asins (asin, marketplace) VALUES (%s, %s)", (asin, marketplace))
+    return cur.lastrowid
+
+# callbacks run after every finished scan (e.g. the web app's summary cache invalidation)
+SCAN_COMPLETE_HOOKS = []
+
+def _notify_scan_complete(asin, marketplace):
+    for hook in SCAN_COMPLETE_HOOKS:
         try:
-            cur.close()
-            db.close()
+            hook(asin, marketplace)
         except Exception:
-            pass
-        raise
+            logger.exception("Scan-Complete-Hook %r fehlgeschlagen", hook)
 
-    # extended extractor returns joined_text, hrefs, title and full raw html
-    text, hrefs, title_tag, raw_html = extract_text_and_hrefs(html)
+def update_summary(cur, asin_id, status, open_findings=None, pattern_hits=None):
+    """Incrementally update the dashboard summary tables after one scan.
 
-    # load patterns (use helper to compile)
-    compiled_patterns = load_active_patterns(cur)
-    if DEBUG_MODE:
-        logger.debug("Loaded %d compiled patterns", len(compiled_patterns))
+    open_findings replaces the ASIN's count (findings of the latest scan); it is
+    left untouched when None (failed scan). pattern_hits ({pattern_id: hits}) is
+    added to the per-pattern totals.
+    """
+    if asin_id is not None:
+        if open_findings is None:
+            cur.execute("""
+                INSERT INTO asin_summary (asin_id, last_status, last_scanned_at) VALUES (%s, %s, NOW())
+                ON DUPLICATE KEY UPDATE last_status = VALUES(last_status), last_scanned_at = VALUES(last_scanned_at)
+            """, (asin_id, status))
+        else:
+            cur.execute("""
+                INSERT INTO asin_summary (asin_id, open_findings, last_status, last_scanned_at) VALUES (%s, %s, %s, NOW())
+                ON DUPLICATE KEY UPDATE open_findings = VALUES(open_findings), last_status = VALUES(last_status),
+                                        last_scanned_at = VALUES(last_scanned_at)
+            """, (asin_id, open_findings, status))
+    if pattern_hits:
+        cur.executemany("""
+            INSERT INTO pattern_summary (pattern_id, hits) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE hits = hits + VALUES(hits)
+        """, list(pattern_hits.items()))
+
+def run_scan_for_asin(asin, marketplace=None):
+    """Scan a single ASIN on one marketplace once. Returns number of matches inserted."""
+    marketplace, _ = get_marketplace(marketplace)
+    logger.info("Start scan for ASIN %s [%s]", asin, marketplace) if not DEBUG_MODE else logger.debug("Start scan for ASIN %s [%s]", asin, marketplace)
+    try:
+        db = get_db()
+        cur = db.cursor()
+    except Exception as e:
+        logger.exception("Keine DB-Verbindung für Scan von %s [%s]: %s", asin, marketplace, e)
+        raise
 
     matches_inserted = 0
+    asin_id = None
+    pattern_hits = {}
+    fetched = False
+    try:
+        url, html, encoding = fetch_product_html(asin, marketplace)
+        fetched = True
 
-    # For each pattern, search in title, joined text, raw_html and hrefs
-    for pid, name, cre in compiled_patterns:
-        total_pattern_matches = 0
-
-        # search title
-        title_matches = 0
-        if title_tag:
-            for m in cre.finditer(title_tag):
-                matched_text = m.group(0)
-                matched_group = m.group(1) if m.groups() else None
-                cur.execute("SELECT id FROM asins WHERE asin=%s", (asin,))
-                row = cur.fetchone()
-                if row:
-                    asin_id = row[0]
-                else:
-                    cur.execute("INSERT INTO asins (asin) VALUES (%s)", (asin,))
-                    asin_id = cur.lastrowid
-                cur.execute("""
-                    INSERT INTO results (asin_id, pattern_id, matched_text, matched_group, source_url)
-                    VALUES (%s,%s,%s,%s,%s)
-                """, (asin_id, pid, matched_text, matched_group, url))
-                matches_inserted += 1
-                title_matches += 1
-                total_pattern_matches += 1
+        # search title, joined region texts, full page text and region hrefs
+        sources = page_sources(html, encoding)
+        del html  # raw page no longer needed, only the extracted sources are searched
+
+        # load patterns (use helper to compile)
+        compiled_patterns = load_active_patterns(cur)
+        if DEBUG_MODE:
+            logger.debug("Loaded %d compiled patterns", len(compiled_patterns))
+
+        for pid, name, cre in compiled_patterns:
+            counts = dict.fromkeys(sources, 0)
+            matches = list(find_matches(cre, sources))
+            for m in matches:
+                counts[m.source] += 1
                 if DEBUG_MODE:
-                    logger.debug("Title match ASIN %s pattern_id=%s matched_text=%s", asin, pid, matched_text[:200])
-
-        # search joined text (extracted sections)
-        text_matches = 0
-        for m in cre.finditer(text):
-            matched_text = m.group(0)
-            matched_group = m.group(1) if m.groups() else None
-            cur.execute("SELECT id FROM asins WHERE asin=%s", (asin,))
-            row = cur.fetchone()
-            if row:
-                asin_id = row[0]
-            else:
-                cur.execute("INSERT INTO asins (asin) VALUES (%s)", (asin,))
-                asin_id = cur.lastrowid
-            cur.execute("""
-                INSERT INTO results (asin_id, pattern_id, matched_text, matched_group, source_url)
-                VALUES (%s,%s,%s,%s,%s)
-            """, (asin_id, pid, matched_text, matched_group, url))
-            matches_inserted += 1
-            text_matches += 1
-            total_pattern_matches += 1
-            if DEBUG_MODE:
-                logger.debug("Text match ASIN %s pattern_id=%s matched_text=%s", asin, pid, matched_text[:200])
-
-        # search raw HTML (covers cases where important text sits in attributes or markup)
-        html_matches = 0
-        for m in cre.finditer(raw_html):
-            matched_text = m.group(0)
-            matched_group = m.group(1) if m.groups() else None
-            cur.execute("SELECT id FROM asins WHERE asin=%s", (asin,))
-            row = cur.fetchone()
-            if row:
-                asin_id = row[0]
-            else:
-                cur.execute("INSERT INTO asins (asin) VALUES (%s)", (asin,))
-                asin_id = cur.lastrowid
-            cur.execute("""
-                INSERT INTO results (asin_id, pattern_id, matched_text, matched_group, source_url)
-                VALUES (%s,%s,%s,%s,%s)
-            """, (asin_id, pid, matched_text, matched_group, url))
-            matches_inserted += 1
-            html_matches += 1
-            total_pattern_matches += 1
+                    logger.debug("%s match ASIN %s pattern_id=%s matched_text=%s", m.source.capitalize(), asin, pid, m.text(sources)[:200])
+
             if DEBUG_MODE:
-                logger.debug("HTML match ASIN %s pattern_id=%s matched_text=%s", asin, pid, matched_text[:200])
-
-        # hrefs
-        href_matches = 0
-        for href in hrefs:
-            for m in cre.finditer(href):
-                matched_text = m.group(0)
-                matched_group = m.group(1) if m.groups() else None
-                cur.execute("SELECT id FROM asins WHERE asin=%s", (asin,))
-                row = cur.fetchone()
-                if row:
-                    asin_id = row[0]
-                else:
-                    cur.execute("INSERT INTO asins (asin) VALUES (%s)", (asin,))
-                    asin_id = cur.lastrowid
-                cur.execute("""
-                    INSERT INTO results (asin_id, pattern_id, matched_text, matched_group, source_url)
-                    VALUES (%s,%s,%s,%s,%s)
-                """, (asin_id, pid, matched_text, matched_group, url))
-                matches_inserted += 1
-                href_matches += 1
-                total_pattern_matches += 1
-                if DEBUG_MODE:
-                    logger.debug("Href match ASIN %s pattern_id=%s matched_text=%s href=%s", asin, pid, matched_text[:200], href[:200])
+                logger.debug("Pattern id=%s name=%s matches: title=%d text=%d html=%d hrefs=%d total=%d",
+                             pid, name, counts["title"], counts["text"], counts["html"], counts["href"], len(matches))
 
-        if DEBUG_MODE:
-            logger.debug("Pattern id=%s name=%s matches: title=%d text=%d html=%d hrefs=%d total=%d",
-                         pid, name, title_matches, text_matches, html_matches, href_matches, total_pattern_matches)
+            if not matches:
+                if DEBUG_MODE:
+                    logger.debug("No matches for ASIN %s pattern_id=%s across all sources", asin, pid)
+                continue
 
-        if total_pattern_matches == 0 and DEBUG_MODE:
-            logger.debug("No matches for ASIN %s pattern_id=%s across all sources", asin, pid)
+            if asin_id is None:
+                asin_id = _get_asin_id(cur, asin, marketplace, create=True)
+            # substrings are only materialized here, for the insert
+            cur.executemany("""
+                INSERT INTO results (asin_id, pattern_id, matched_text, matched_group, source_url)
+                VALUES (%s,%s,%s,%s,%s)
+            """, [(asin_id, pid, m.text(sources), m.group(sources), url) for m in matches])
+            matches_inserted += len(matches)
+            pattern_hits[pid] = len(matches)
 
-    # update last_checked timestamp
-    cur.execute("UPDATE asins SET last_checked = NOW() WHERE asin = %s", (asin,))
+        # update last_checked timestamp
+        cur.execute("UPDATE asins SET last_checked = NOW() WHERE asin = %s AND marketplace = %s", (asin, marketplace))
 
-    # ensure we have asin_id for logging
-    cur.execute("SELECT id FROM asins WHERE asin=%s", (asin,))
-    row = cur.fetchone()
-    asin_id = row[0] if row else None
+        # ensure we have asin_id for logging
+        if asin_id is None:
+            asin_id = _get_asin_id(cur, asin, marketplace)
 
-    # write scan log (always record, auch wenn 0 Treffer)
-    try:
-        cur.execute(
-            "INSERT INTO scan_logs (asin_id, matches_count, note) VALUES (%s, %s, %s)",
-            (asin_id, matches_inserted, None)
-        )
+        # write scan log (always record, auch wenn 0 Treffer)
+        try:
+            cur.execute(
+                "INSERT INTO scan_logs (asin_id, marketplace, matches_count, note) VALUES (%s, %s, %s, %s)",
+                (asin_id, marketplace, matches_inserted, None)
+            )
+        except Exception as e:
+            logger.exception("Fehler beim Schreiben des Scan-Logs für %s [%s]: %s", asin, marketplace, e)
     except Exception as e:
-        logger.exception("Fehler beim Schreiben des Scan-Logs für %s: %s", asin, e)
-
-    cur.close()
-    db.close()
+        # the only place a failed scan is logged; callers just decide about retries
+        if throttle_status(e):
+            # throttling is handled (and logged once) by the marketplace lane
+            logger.debug("Abruf für %s [%s] gedrosselt: %s", asin, marketplace, e)
+        elif not fetched:
+            logger.exception("Fehler beim Abruf für %s [%s]: %s", asin, marketplace, e)
+        else:
+            logger.exception("Fehler beim Scannen von %s [%s]: %s", asin, marketplace, e)
+        # keep the previous open findings, but count hits already written to results
+        try:
+            if asin_id is None:
+                asin_id = _get_asin_id(cur, asin, marketplace)
+            update_summary(cur, asin_id, "error", pattern_hits=pattern_hits)
+        except Exception:
+            logger.exception("Fehler beim Aktualisieren der Summary für %s [%s]", asin, marketplace)
+        raise
+    else:
+        # dashboard summary (incremental, so the web UI never aggregates results/scan_logs)
+        try:
+            update_summary(cur, asin_id, "ok", matches_inserted, pattern_hits)
+        except Exception as e:
+            logger.exception("Fehler beim Aktualisieren der Summary für %s [%s]: %s", asin, marketplace, e)
+    finally:
+        try:
+            cur.close()
+            db.close()
+        except Exception:
+            pass
+        _notify_scan_complete(asin, marketplace)
 
     # Neuer Log: explizit "keine Treffer" protokollieren
     if matches_inserted == 0:
-        logger.info("ASIN %s: keine Treffer gefunden.", asin)
+        logger.info("ASIN %s [%s]: keine Treffer gefunden.", asin, marketplace)
     else:
-        logger.info("ASIN %s gescannt, %d Treffer.", asin, matches_inserted)
+        logger.info("ASIN %s [%s] gescannt, %d Treffer.", asin, marketplace, matches_inserted)
 
     return matches_inserted
 
+class MarketplaceLane:
+    """Scheduling lane for one marketplace with its own concurrency and rate budget.
+
+    Every lane spaces its request starts by `sleep` seconds and runs up to
+    `concurrency` scans in parallel. A 429/503 answer only pushes back this
+    lane (by `backoff` seconds), the other marketplaces keep scanning; the
+    throttled ASIN is retried up to `retries` times.
+    """
+
+    def __init__(self, code, settings):
+        self.code = code
+        self.concurrency = max(1, int(settings.get("concurrency", 1)))
+        self.sleep = float(settings.get("sleep", config.REQUESTS_SLEEP) or 0)
+        self.backoff = float(settings.get("backoff", 60) or 0)
+        self.retries = max(0, int(settings.get("retries", 2)))
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait_turn(self):
+        """Block until this lane's rate budget allows the next request."""
+        with self._lock:
+            slot = max(time.monotonic(), self._next_slot)
+            self._next_slot = slot + self.sleep
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def throttle(self):
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + self.backoff)
+
+    def _scan(self, asin):
+        # failures are logged by run_scan_for_asin; the lane only logs its throttle/retry decisions
+        attempts = 1 + self.retries
+        for attempt in range(1, attempts + 1):
+            self.wait_turn()
+            try:
+                if DEBUG_MODE:
+                    logger.debug("Scanning ASIN %s [%s] (Versuch %d/%d)", asin, self.code, attempt, attempts)
+                return run_scan_for_asin(asin, self.code)
+            except Exception as e:
+                status = throttle_status(e)
+                if status is None:
+                    return 0
+                self.throttle()
+                if attempt < attempts:
+                    logger.warning("Marktplatz %s drosselt (HTTP %s), Lane pausiert %.0fs, %s wird erneut versucht (%d/%d).",
+                                   self.code, status, self.backoff, asin, attempt + 1, attempts)
+                else:
+                    logger.warning("Marktplatz %s drosselt (HTTP %s), %s nach %d Versuchen übersprungen.",
+                                   self.code, status, asin, attempts)
+        return 0
+
+    def run(self, asins):
+        """Scan all given ASINs on this marketplace. Returns number of matches."""
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=f"lane-{self.code}") as pool:
+            total = sum(pool.map(self._scan, asins))
+        logger.info("Marktplatz %s: %d ASINs gescannt, %d Treffer.", self.code, len(asins), total)
+        return total
+
 def run_full_scan(limit=None):
-    """Scans all active ASINs. limit optional for testing."""
+    """Scans all active ASINs, one lane per marketplace. limit optional for testing."""
     db = get_db()
     cur = db.cursor()
-    q = "SELECT asin FROM asins WHERE active=1 ORDER BY id"
+    q = "SELECT asin, marketplace FROM asins WHERE active=1 ORDER BY id"
     if limit:
         q += " LIMIT %s"
         cur.execute(q, (limit,))
@@ -327,24 +504,103 @@ def run_full_scan(limit=None):
     cur.close()
     db.close()
 
-    total = 0
+    by_marketplace = {}
+    for asin, marketplace in rows:
+        code = (marketplace or DEFAULT_MARKETPLACE).lower()
+        if code not in MARKETPLACES:
+            logger.error("ASIN %s: unbekannter Marktplatz %s, übersprungen.", asin, marketplace)
+            continue
+        by_marketplace.setdefault(code, []).append(asin)
+
     if DEBUG_MODE:
-        logger.debug("Starting full scan for %d asins (limit=%s)", len(rows), limit)
-    for r in rows:
-        asin = r[0]
-        try:
-            if DEBUG_MODE:
-                logger.debug("Scanning ASIN %s", asin)
-            matched = run_scan_for_asin(asin)
-            total += matched
-        except Exception as e:
-            logger.exception("Fehler beim Scannen von %s: %s", asin, e)
-        time.sleep(config.REQUESTS_SLEEP)
+        logger.debug("Starting full scan for %d asins on %d marketplaces (limit=%s)", len(rows), len(by_marketplace), limit)
+    lanes = [(MarketplaceLane(code, MARKETPLACES[code]), asins) for code, asins in by_marketplace.items()]
+    total = 0
+    if lanes:
+        with ThreadPoolExecutor(max_workers=len(lanes), thread_name_prefix="marketplace") as pool:
+            total = sum(pool.map(lambda item: item[0].run(item[1]), lanes))
     logger.info("Full scan beendet, insgesamt %d Treffer gefunden.", total)
     return total
 
+def _max_rss():
+    """Process max RSS in bytes (includes native allocations, e.g. libxml2), None if unavailable."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024  # Linux reports KiB, macOS bytes
+
+def _format_rss(after, before):
+    if after is None:
+        return "max RSS n/a"
+    text = f"max RSS {after / 1024 / 1024:.1f} MiB"
+    if before is not None:
+        text += f" (+{(after - before) / 1024 / 1024:.1f} MiB)"
+    return text
+
+def bench_pages(targets):
+    """Fetch, extract and match pages without writing to the DB, printing time and memory per page.
+
+    Memory per page is the Python-heap peak (tracemalloc, does not see libxml2)
+    plus the process max RSS and its growth during that page.
+    targets: list of "ASIN" or "ASIN:marketplace".
+    Returns list of (asin, marketplace, bytes, seconds, heap_peak_bytes, max_rss_bytes, matches).
+    """
+    try:
+        db = get_db()
+        cur = db.cursor()
+        compiled_patterns = load_active_patterns(cur)
+        cur.close()
+        db.close()
+    except Exception as e:
+        logger.warning("Patterns konnten nicht geladen werden (%s), Benchmark ohne Matching.", e)
+        compiled_patterns = []
+
+    stats = []
+    tracemalloc.start()
+    try:
+        for target in targets:
+            asin, _, marketplace = target.partition(":")
+            try:
+                marketplace, _ = get_marketplace(marketplace or None)
+            except ValueError as e:
+                logger.error("Bench %s: %s, übersprungen.", target, e)
+                continue
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            rss_before = _max_rss()
+            start = time.time()
+            try:
+                url, html, encoding = fetch_product_html(asin, marketplace)
+            except Exception as e:
+                logger.error("Bench %s [%s]: Abruf fehlgeschlagen: %s", asin, marketplace, e)
+                continue
+            size = len(html)
+            sources = page_sources(html, encoding)
+            del html
+            matches = sum(1 for _, _, cre in compiled_patterns for _ in find_matches(cre, sources))
+            elapsed = time.time() - start
+            _, peak = tracemalloc.get_traced_memory()
+            rss_after = _max_rss()
+            del sources
+            stats.append((asin, marketplace, size, elapsed, peak - base, rss_after, matches))
+            print(f"{asin} [{marketplace}] {size / 1024:.1f} KiB, {elapsed:.2f}s, "
+                  f"Python-Heap-Peak {(peak - base) / 1024 / 1024:.2f} MiB, {_format_rss(rss_after, rss_before)}, {matches} Treffer")
+    finally:
+        tracemalloc.stop()
+
+    if stats:
+        peaks = [s[4] for s in stats]
+        print(f"{len(stats)} Seiten: Python-Heap-Peak/Seite avg {sum(peaks) / len(peaks) / 1024 / 1024:.2f} MiB, "
+              f"max {max(peaks) / 1024 / 1024:.2f} MiB (tracemalloc, ohne native libxml2-Allokationen); "
+              f"{_format_rss(stats[-1][5], None)}")
+    return stats
+
 # If invoked as script, run full scan
 if __name__ == "__main__":
+    # benchmark mode: python scanner.py --bench ASIN[:marketplace] ...
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        bench_pages(sys.argv[2:])
+        sys.exit(0)
     # optional: pass limit as CLI arg
     arg_limit = None
     if len(sys.argv) > 1:
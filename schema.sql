@@ -5,11 +5,13 @@ USE asinscanner;
 -- ASINs to monitor
 CREATE TABLE IF NOT EXISTS asins (
   id INT AUTO_INCREMENT PRIMARY KEY,
-  asin VARCHAR(32) NOT NULL UNIQUE,
+  asin VARCHAR(32) NOT NULL,
+  marketplace VARCHAR(8) NOT NULL DEFAULT 'de', -- Schlüssel aus config.MARKETPLACES
   note VARCHAR(255) DEFAULT NULL,
   active TINYINT(1) DEFAULT 1,
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-  last_checked TIMESTAMP NULL DEFAULT NULL
+  last_checked TIMESTAMP NULL DEFAULT NULL,
+  UNIQUE KEY uq_asin_marketplace (asin, marketplace)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 -- Regex patterns
@@ -41,8 +43,39 @@ CREATE TABLE IF NOT EXISTS results (
 CREATE TABLE IF NOT EXISTS scan_logs (
   id INT AUTO_INCREMENT PRIMARY KEY,
   asin_id INT NULL,
+  marketplace VARCHAR(8) DEFAULT NULL, -- bleibt erhalten, auch wenn die ASIN gelöscht wird
   scanned_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
   matches_count INT NOT NULL DEFAULT 0,
   note VARCHAR(255) DEFAULT NULL,
   FOREIGN KEY (asin_id) REFERENCES asins(id) ON DELETE SET NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Dashboard-Summary: wird am Ende jedes Scans inkrementell aktualisiert (scanner.update_summary)
+CREATE TABLE IF NOT EXISTS asin_summary (
+  asin_id INT PRIMARY KEY,
+  open_findings INT NOT NULL DEFAULT 0, -- Treffer des letzten erfolgreichen Scans
+  last_status VARCHAR(16) DEFAULT NULL, -- 'ok' oder 'error'
+  last_scanned_at DATETIME DEFAULT NULL,
+  FOREIGN KEY (asin_id) REFERENCES asins(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS pattern_summary (
+  pattern_id INT PRIMARY KEY,
+  hits BIGINT NOT NULL DEFAULT 0, -- Summe aller Treffer
+  FOREIGN KEY (pattern_id) REFERENCES patterns(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Migration bestehender Installationen (vor Multi-Marktplatz):
+-- ALTER TABLE asins ADD COLUMN marketplace VARCHAR(8) NOT NULL DEFAULT 'de' AFTER asin;
+-- ALTER TABLE asins DROP INDEX asin, ADD UNIQUE KEY uq_asin_marketplace (asin, marketplace);
+-- ALTER TABLE scan_logs ADD COLUMN marketplace VARCHAR(8) DEFAULT NULL AFTER asin_id;
+-- UPDATE scan_logs sl JOIN asins a ON sl.asin_id = a.id SET sl.marketplace = a.marketplace;
+
+-- Summary-Tabellen einmalig aus vorhandenen Daten befüllen:
+-- INSERT INTO asin_summary (asin_id, open_findings, last_status, last_scanned_at)
+--   SELECT sl.asin_id, sl.matches_count, 'ok', sl.scanned_at FROM scan_logs sl
+--   JOIN (SELECT MAX(id) AS id FROM scan_logs WHERE asin_id IS NOT NULL GROUP BY asin_id) latest ON latest.id = sl.id
+--   ON DUPLICATE KEY UPDATE open_findings = VALUES(open_findings), last_status = VALUES(last_status), last_scanned_at = VALUES(last_scanned_at);
+-- INSERT INTO pattern_summary (pattern_id, hits)
+--   SELECT pattern_id, COUNT(*) FROM results GROUP BY pattern_id
+--   ON DUPLICATE KEY UPDATE hits = VALUES(hits);